@@ -1,23 +1,62 @@
 import argparse
+import hashlib
+import json
 from pathlib import Path
-from pptx import Presentation  # Cross-platform way to access slide count
-from PIL import Image, PngImagePlugin
+from PIL import Image
 import os
+import struct
+import subprocess
+import tempfile
+import xml.etree.ElementTree as ET
+import zipfile
+import zlib
+
+# PresentationML namespace used by ppt/presentation.xml
+PML_NS = "{http://schemas.openxmlformats.org/presentationml/2006/main}"
+
+# Export hidden slides too so PDF page numbers match slide numbers
+SOFFICE_PDF_FILTER = (
+    'pdf:impress_pdf_Export:{"ExportHiddenSlides":{"type":"boolean","value":"true"}}'
+)
+
+# Upper bound in seconds for each soffice / pdftoppm run, so a hung
+# headless LibreOffice (profile lock, recovery dialog) cannot block forever
+CONVERT_TIMEOUT = 600
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+# Signature (8) + IHDR chunk: length (4) + type (4) + data (13) + CRC (4)
+PNG_IHDR_END = 33
 
 
 def add_timestamp_to_png(png_path: str, timestamp: float) -> None:
     """
     Adds a UNIX timestamp to a PNG file's metadata.
 
+    The tEXt chunk is spliced in directly after IHDR, so the image data is
+    never decoded or re-compressed.
+
     Args:
         png_path (str): Path to the PNG file.
         timestamp (float): UNIX timestamp to add to the PNG metadata.
     """
+    data = b"SourcePPTXTimestamp\x00" + str(timestamp).encode("latin-1")
+    chunk = (
+        struct.pack(">I", len(data))
+        + b"tEXt"
+        + data
+        + struct.pack(">I", zlib.crc32(b"tEXt" + data))
+    )
     try:
-        with Image.open(png_path) as img:
-            meta = PngImagePlugin.PngInfo()
-            meta.add_text("SourcePPTXTimestamp", str(timestamp))
-            img.save(png_path, "PNG", pnginfo=meta)
+        with open(png_path, "r+b") as png_file:
+            header = png_file.read(PNG_IHDR_END)
+            if header[:8] != PNG_SIGNATURE or header[12:16] != b"IHDR":
+                print(
+                    f"Error writing metadata to PNG: {png_path}. Error: not a PNG file"
+                )
+                return
+            remainder = png_file.read()
+            png_file.seek(PNG_IHDR_END)
+            png_file.write(chunk + remainder)
         print(f"Timestamp added to PNG: {png_path}")
     except (IOError, OSError) as e:
         print(f"Error writing metadata to PNG: {png_path}. Error: {e}")
@@ -46,6 +85,9 @@ def get_slide_count(source: str) -> int:
     """
     Gets the number of slides in a PowerPoint file cross-platform without opening PowerPoint.
 
+    Only ppt/presentation.xml is read from the archive; each slide appears
+    there as one sldId entry, so no slide, layout or master parts are parsed.
+
     Args:
         source (str): Path to the PowerPoint (.pptx) file.
 
@@ -53,43 +95,232 @@ def get_slide_count(source: str) -> int:
         int: Number of slides in the presentation.
     """
     try:
-        presentation = Presentation(source)
-        return len(presentation.slides)
-    except Exception as e:
+        with zipfile.ZipFile(source) as archive:
+            with archive.open("ppt/presentation.xml") as xml_file:
+                return sum(
+                    1
+                    for _, elem in ET.iterparse(xml_file)
+                    if elem.tag == f"{PML_NS}sldId"
+                )
+    except (zipfile.BadZipFile, KeyError, ET.ParseError, OSError) as e:
         print(f"Error retrieving slide count: {e}")
         return 0
 
 
-def needs_conversion(source: str, destination: str, num_slides: int) -> bool:
+def get_manifest_path(source: str, destination: str) -> Path:
+    """
+    Returns the path of the conversion manifest for a PowerPoint file.
+
+    Args:
+        source (str): Path to the source PowerPoint file.
+        destination (str): Directory where the PNG files are saved.
+
+    Returns:
+        Path: Path to the `<stem>.manifest.json` file in the destination.
+    """
+    return Path(destination) / f"{Path(source).stem}.manifest.json"
+
+
+def get_source_sha1(source: str) -> str:
+    """
+    Computes the SHA-1 digest of a PowerPoint file's contents.
+
+    Args:
+        source (str): Path to the source PowerPoint file.
+
+    Returns:
+        str: Hex digest of the file contents.
+    """
+    digest = hashlib.sha1()
+    with open(source, "rb") as source_file:
+        for block in iter(lambda: source_file.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def read_manifest(source: str, destination: str) -> dict:
+    """
+    Reads the conversion manifest written by a previous export.
+
+    Args:
+        source (str): Path to the source PowerPoint file.
+        destination (str): Directory where the PNG files are saved.
+
+    Returns:
+        dict: Manifest contents, or an empty dict if missing or unreadable.
+    """
+    try:
+        with open(get_manifest_path(source, destination), encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (IOError, OSError, ValueError) as e:
+        print(f"Error reading manifest for: {source}. Error: {e}")
+        return {}
+
+
+def write_manifest(
+    source: str,
+    destination: str,
+    num_slides: int,
+    source_mtime: float,
+    source_sha1: str,
+    width: int = None,
+    height: int = None,
+) -> None:
+    """
+    Records the state of a completed export so later runs can skip it.
+
+    Args:
+        source (str): Path to the source PowerPoint file.
+        destination (str): Directory where the PNG files are saved.
+        num_slides (int): Number of slides exported.
+        source_mtime (float): Source modification time the PNGs were made from.
+        source_sha1 (str): Source SHA-1 digest the PNGs were made from.
+        width (int): Requested PNG width, if any.
+        height (int): Requested PNG height, if any.
+    """
+    manifest = {
+        "source_mtime": source_mtime,
+        "source_sha1": source_sha1,
+        "num_slides": num_slides,
+        "size": {"width": width, "height": height},
+    }
+    try:
+        with open(get_manifest_path(source, destination), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+    except (IOError, OSError) as e:
+        print(f"Error writing manifest for: {source}. Error: {e}")
+
+
+def get_existing_pngs(source: str, destination: str) -> dict:
+    """
+    Lists the slide PNGs already present in the destination with one directory scan.
+
+    Args:
+        source (str): Path to the source PowerPoint file.
+        destination (str): Directory where the PNG files are saved.
+
+    Returns:
+        dict: Mapping of PNG file name to its modification time.
+    """
+    prefix = f"{Path(source).stem}-slide-"
+    try:
+        with os.scandir(destination) as entries:
+            return {
+                entry.name: entry.stat().st_mtime
+                for entry in entries
+                if entry.name.startswith(prefix) and entry.name.endswith(".png")
+            }
+    except (IOError, OSError):
+        return {}
+
+
+def needs_conversion(
+    source: str,
+    destination: str,
+    num_slides: int,
+    width: int = None,
+    height: int = None,
+) -> bool:
     """
     Pre-checks existing PNG files to see if conversion is necessary.
 
+    The manifest from the previous export is consulted first; without one,
+    PNG modification times from a single directory scan are compared against
+    the source, and the embedded timestamp is only read when a PNG is older.
+
+    This check may write the manifest: it is refreshed when the source mtime
+    moved but its content hash did not, and created when the per-PNG fallback
+    finds every slide up-to-date, so later runs take the manifest path.
+
     Args:
         source (str): Path to the source PowerPoint file.
         destination (str): Directory where the PNG files will be saved.
         num_slides (int): Number of slides in the presentation.
+        width (int): Requested PNG width, if any.
+        height (int): Requested PNG height, if any.
 
     Returns:
         bool: True if any slide needs updating or is missing, False otherwise.
     """
     source_timestamp = os.path.getmtime(source)
+    stem = Path(source).stem
+    existing = get_existing_pngs(source, destination)
 
-    for i in range(1, num_slides + 1):
-        output_name = f"{Path(source).stem}-slide-{i:02}.png"
-        output_path = Path(destination) / output_name
-        if not output_path.exists():
+    output_names = [f"{stem}-slide-{i:02}.png" for i in range(1, num_slides + 1)]
+    for i, output_name in enumerate(output_names, start=1):
+        if output_name not in existing:
             print(f"PNG file missing for slide {i}: {output_name}")
             return True
-        existing_timestamp = get_timestamp_from_png(output_path)
+
+    manifest = read_manifest(source, destination)
+    if manifest:
+        size = {"width": width, "height": height}
+        if manifest.get("num_slides") != num_slides or manifest.get("size") != size:
+            print("Slide count or PNG size changed since last export.")
+            return True
+        # A newer mtime alone is not proof of change (e.g. after a git checkout)
+        if manifest.get("source_mtime", 0.0) < source_timestamp:
+            source_sha1 = get_source_sha1(source)
+            if manifest.get("source_sha1") != source_sha1:
+                print("Source PPTX changed since last export.")
+                return True
+            # Content is unchanged; record the new mtime so it is not hashed again
+            write_manifest(
+                source,
+                destination,
+                num_slides,
+                source_timestamp,
+                source_sha1,
+                width,
+                height,
+            )
+        print("All PNG files are up-to-date.")
+        return False
+
+    dest_path = Path(destination)
+
+    for i, output_name in enumerate(output_names, start=1):
+        if existing[output_name] >= source_timestamp:
+            continue
+        # File mtime is not conclusive (e.g. restored from git); check the PNG
+        existing_timestamp = get_timestamp_from_png(dest_path / output_name)
         if existing_timestamp < source_timestamp:
             print(f"PNG file outdated for slide {i}: {output_name}")
             return True
 
+    # Record the verified state so later runs skip the per-PNG check
+    write_manifest(
+        source,
+        destination,
+        num_slides,
+        source_timestamp,
+        get_source_sha1(source),
+        width,
+        height,
+    )
     print("All PNG files are up-to-date.")
     return False
 
 
-def export_slides_as_png(
+def _start_powerpoint():
+    """
+    Launches a minimized PowerPoint instance through COM.
+
+    Returns:
+        The PowerPoint.Application COM object.
+    """
+    import comtypes.client  # Importing here to avoid loading if not needed
+
+    powerpoint = comtypes.client.CreateObject("Powerpoint.Application")
+    powerpoint.Visible = 1
+    powerpoint.WindowState = 2  # Minimize the PowerPoint window
+    return powerpoint
+
+
+def _export_one(
+    powerpoint,
     source: str,
     destination: str,
     num_slides: int,
@@ -98,24 +329,24 @@ def export_slides_as_png(
     log: bool = False,
 ) -> None:
     """
-    Exports each slide in a PowerPoint file to individual PNG images with timestamp checking.
-    """
-    # Check if conversion is needed before opening PowerPoint
-    if not needs_conversion(source, destination, num_slides):
-        print("No slides need conversion. Exiting.")
-        return
-
-    print("Starting slide export process...")
-    import comtypes.client  # Importing here to avoid loading if not needed
-
-    powerpoint = comtypes.client.CreateObject("Powerpoint.Application")
-    powerpoint.Visible = 1
-    powerpoint.WindowState = 2  # Minimize the PowerPoint window
-    presentation = powerpoint.Presentations.Open(source)
+    Exports every slide of one presentation using an already running PowerPoint.
 
+    Args:
+        powerpoint: PowerPoint.Application COM object.
+        source (str): Path to the source PowerPoint file.
+        destination (str): Directory where the PNG files will be saved.
+        num_slides (int): Number of slides in the presentation.
+        width (int): Requested PNG width, if any.
+        height (int): Requested PNG height, if any.
+        log (bool): Whether to log each created PNG.
+    """
+    # Capture the source state before export so the manifest matches the PNGs
     source_timestamp = os.path.getmtime(source)
+    source_sha1 = get_source_sha1(source)
 
-    for i, slide in enumerate(presentation.Slides, start=1):
+    presentation = powerpoint.Presentations.Open(source)
+    try:
+        # Slide geometry is shared by every slide in a presentation
         slide_width = presentation.PageSetup.SlideWidth
         slide_height = presentation.PageSetup.SlideHeight
         aspect_ratio = slide_height / slide_width
@@ -132,24 +363,278 @@ def export_slides_as_png(
             ppt_width = 1280  # Default width
             ppt_height = int(ppt_width * aspect_ratio)
 
-        output_name = f"{Path(source).stem}-slide-{i:02}.png"
-        output_path = str(Path(destination) / output_name)
+        stem = Path(source).stem
+        dest_path = Path(destination)
+
+        for i, slide in enumerate(presentation.Slides, start=1):
+            output_name = f"{stem}-slide-{i:02}.png"
+            output_path = str(dest_path / output_name)
+
+            # Export slide as PNG
+            print(f"Exporting slide {i} as PNG...")
+            slide.Export(output_path, "PNG", ppt_width, ppt_height)
+            add_timestamp_to_png(
+                output_path, source_timestamp
+            )  # Embed UNIX timestamp in PNG
+
+            if log:
+                print(f"Created PNG: {output_name}")
+    finally:
+        presentation.Close()
+
+    write_manifest(
+        source,
+        destination,
+        num_slides,
+        source_timestamp,
+        source_sha1,
+        width,
+        height,
+    )
 
-        # Export slide as PNG
-        print(f"Exporting slide {i} as PNG...")
-        slide.Export(output_path, "PNG", ppt_width, ppt_height)
-        add_timestamp_to_png(
-            output_path, source_timestamp
-        )  # Embed UNIX timestamp in PNG
 
-        if log:
-            print(f"Created PNG: {output_name}")
+def export_slides_as_png(
+    source: str,
+    destination: str,
+    num_slides: int,
+    width: int = None,
+    height: int = None,
+    log: bool = False,
+) -> None:
+    """
+    Exports each slide in a PowerPoint file to individual PNG images with timestamp checking.
+    """
+    # Check if conversion is needed before opening PowerPoint
+    if not needs_conversion(source, destination, num_slides, width, height):
+        print("No slides need conversion. Exiting.")
+        return
 
-    presentation.Close()
+    print("Starting slide export process...")
+    powerpoint = _start_powerpoint()
+    _export_one(powerpoint, source, destination, num_slides, width, height, log)
     powerpoint.Quit()
     print("Slide export process completed.")
 
 
+def _export_one_via_libreoffice(
+    source: str,
+    destination: str,
+    num_slides: int,
+    width: int = None,
+    height: int = None,
+    log: bool = False,
+) -> bool:
+    """
+    Renders one presentation to PDF with LibreOffice and rasterizes it with pdftoppm.
+
+    Args:
+        source (str): Path to the source PowerPoint file.
+        destination (str): Directory where the PNG files will be saved.
+        num_slides (int): Number of slides in the presentation.
+        width (int): Requested PNG width, if any.
+        height (int): Requested PNG height, if any.
+        log (bool): Whether to log each created PNG.
+
+    Returns:
+        bool: True if the export succeeded, False otherwise.
+    """
+    if width and height:
+        scale_args = ["-scale-to-x", str(width), "-scale-to-y", str(height)]
+    elif height:
+        scale_args = ["-scale-to-x", "-1", "-scale-to-y", str(height)]
+    else:
+        scale_args = ["-scale-to-x", str(width or 1280), "-scale-to-y", "-1"]
+
+    # Capture the source state before export so the manifest matches the PNGs
+    source_timestamp = os.path.getmtime(source)
+    source_sha1 = get_source_sha1(source)
+    stem = Path(source).stem
+    dest_path = Path(destination)
+
+    # Stage inside the destination so finished pages are renamed into place
+    # rather than copied across filesystems
+    with tempfile.TemporaryDirectory(dir=destination, prefix=f".{stem}-") as tmp:
+        tmp_path = Path(tmp)
+        try:
+            print("Rendering presentation to PDF with LibreOffice...")
+            subprocess.run(
+                [
+                    "soffice",
+                    "--headless",
+                    "--convert-to",
+                    SOFFICE_PDF_FILTER,
+                    "--outdir",
+                    tmp,
+                    source,
+                ],
+                check=True,
+                capture_output=True,
+                timeout=CONVERT_TIMEOUT,
+            )
+            print("Converting PDF pages to PNG with pdftoppm...")
+            subprocess.run(
+                [
+                    "pdftoppm",
+                    "-png",
+                    *scale_args,
+                    str(tmp_path / f"{stem}.pdf"),
+                    str(tmp_path / "page"),
+                ],
+                check=True,
+                capture_output=True,
+                timeout=CONVERT_TIMEOUT,
+            )
+        except (subprocess.CalledProcessError, subprocess.TimeoutExpired) as e:
+            stderr = (e.stderr or b"").decode(errors="replace").strip()
+            print(
+                f"Error converting with LibreOffice: {source}. Error: {e} {stderr}".rstrip()
+            )
+            return False
+        except OSError as e:
+            print(f"Error converting with LibreOffice: {source}. Error: {e}")
+            return False
+
+        # pdftoppm zero-pads page numbers to the width of the page count
+        pages = sorted(
+            tmp_path.glob("page-*.png"),
+            key=lambda page: int(page.stem.rsplit("-", 1)[1]),
+        )
+        if len(pages) != num_slides:
+            print(
+                f"Error converting with LibreOffice: {source}. "
+                f"Error: expected {num_slides} pages but got {len(pages)}"
+            )
+            return False
+
+        for i, page in enumerate(pages, start=1):
+            output_name = f"{stem}-slide-{i:02}.png"
+            output_path = str(dest_path / output_name)
+            os.replace(page, output_path)
+            add_timestamp_to_png(
+                output_path, source_timestamp
+            )  # Embed UNIX timestamp in PNG
+
+            if log:
+                print(f"Created PNG: {output_name}")
+
+    write_manifest(
+        source,
+        destination,
+        num_slides,
+        source_timestamp,
+        source_sha1,
+        width,
+        height,
+    )
+    return True
+
+
+def convert_via_libreoffice(
+    source: str,
+    destination: str,
+    num_slides: int,
+    width: int = None,
+    height: int = None,
+    log: bool = False,
+) -> None:
+    """
+    Exports each slide to PNG using headless LibreOffice and pdftoppm instead of PowerPoint.
+
+    Args:
+        source (str): Path to the source PowerPoint file.
+        destination (str): Directory where the PNG files will be saved.
+        num_slides (int): Number of slides in the presentation.
+        width (int): Requested PNG width, if any.
+        height (int): Requested PNG height, if any.
+        log (bool): Whether to log each created PNG.
+    """
+    if not needs_conversion(source, destination, num_slides, width, height):
+        print("No slides need conversion. Exiting.")
+        return
+
+    print("Starting slide export process...")
+    if not _export_one_via_libreoffice(
+        source, destination, num_slides, width, height, log
+    ):
+        print("Slide export process failed.")
+        return
+    print("Slide export process completed.")
+
+
+def convert_many(
+    sources: list[str],
+    destination: str = None,
+    width: int = None,
+    height: int = None,
+    log: bool = False,
+    backend: str = "com",
+) -> None:
+    """
+    Exports the slides of several PowerPoint files, launching PowerPoint only once.
+
+    Args:
+        sources (list[str]): Paths to the source PowerPoint files.
+        destination (str): Directory where the PNG files will be saved.
+            Defaults to each source file's directory.
+        width (int): Requested PNG width, if any.
+        height (int): Requested PNG height, if any.
+        log (bool): Whether to log each created PNG.
+        backend (str): "com" to render with PowerPoint, "libreoffice" to
+            render with LibreOffice and pdftoppm.
+    """
+    # Check every file before opening PowerPoint
+    pending = []
+    for source in sources:
+        print(f"Checking: {source}")
+        num_slides = get_slide_count(source)
+        if num_slides == 0:
+            print(f"Could not retrieve slide count. Skipping: {source}")
+            continue
+        source_destination = destination or str(Path(source).parent)
+        if needs_conversion(source, source_destination, num_slides, width, height):
+            pending.append((source, source_destination, num_slides))
+
+    if not pending:
+        print("No slides need conversion. Exiting.")
+        return
+
+    print("Starting slide export process...")
+    failed = []
+    if backend == "libreoffice":
+        for source, source_destination, num_slides in pending:
+            print(f"Exporting slides from: {source}")
+            if not _export_one_via_libreoffice(
+                source, source_destination, num_slides, width, height, log
+            ):
+                failed.append(source)
+    else:
+        powerpoint = _start_powerpoint()
+        try:
+            for source, source_destination, num_slides in pending:
+                print(f"Exporting slides from: {source}")
+                # Keep going so one corrupt or protected deck does not stop the batch
+                try:
+                    _export_one(
+                        powerpoint,
+                        source,
+                        source_destination,
+                        num_slides,
+                        width,
+                        height,
+                        log,
+                    )
+                except Exception as e:
+                    print(f"Error exporting slides from: {source}. Error: {e}")
+                    failed.append(source)
+        finally:
+            powerpoint.Quit()
+
+    if failed:
+        print(f"Slide export process failed for: {', '.join(failed)}")
+        return
+    print("Slide export process completed.")
+
+
 def main() -> None:
     """
     Main function to parse arguments and run the slide export process.
@@ -159,12 +644,18 @@ def main() -> None:
     parser = argparse.ArgumentParser(
         description="Convert PowerPoint slides to PNG images with timestamp checks."
     )
-    parser.add_argument(
+    input_group = parser.add_mutually_exclusive_group(required=True)
+    input_group.add_argument(
         "-s",
         "--source",
-        required=True,
         help="Path to the source PowerPoint (.pptx) file.",
     )
+    input_group.add_argument(
+        "-b",
+        "--batch",
+        metavar="DIR",
+        help="Convert every .pptx file in DIR using a single PowerPoint instance.",
+    )
     parser.add_argument(
         "-d",
         "--destination",
@@ -188,24 +679,54 @@ def main() -> None:
         action="store_true",
         help="Enable logging of the file names being processed.",
     )
+    parser.add_argument(
+        "--backend",
+        choices=["com", "libreoffice"],
+        default="com",
+        help="Rendering backend: PowerPoint via COM (default) or headless LibreOffice with pdftoppm.",
+    )
 
     args = parser.parse_args()
 
-    source = str(Path(args.source).resolve())
-    destination = args.destination or Path(source).parent
     width = args.width
     height = args.height
     log = args.log
 
+    if args.batch:
+        batch_dir = Path(args.batch).resolve()
+        # Skip the "~$" lock files PowerPoint leaves next to open decks
+        sources = [
+            str(path)
+            for path in sorted(batch_dir.glob("*.pptx"))
+            if not path.name.startswith("~$")
+        ]
+        if not sources:
+            print(f"No .pptx files found in: {batch_dir}")
+            return
+
+        destination = args.destination or str(batch_dir)
+        Path(destination).mkdir(parents=True, exist_ok=True)
+
+        convert_many(sources, destination, width, height, log, args.backend)
+
+        print("PNG conversion process completed.")
+        return
+
+    source = str(Path(args.source).resolve())
+    destination = args.destination or Path(source).parent
+
     Path(destination).mkdir(parents=True, exist_ok=True)
 
-    # Get slide count cross-platform using python-pptx
+    # Get slide count cross-platform straight from the .pptx archive
     num_slides = get_slide_count(source)
     if num_slides == 0:
         print("Could not retrieve slide count. Exiting.")
         return
 
-    export_slides_as_png(source, destination, num_slides, width, height, log)
+    if args.backend == "libreoffice":
+        convert_via_libreoffice(source, destination, num_slides, width, height, log)
+    else:
+        export_slides_as_png(source, destination, num_slides, width, height, log)
 
     print("PNG conversion process completed.")
 